@@ -0,0 +1,60 @@
+"""Compare retracting facts one at a time against Environment.retract_where.
+
+Usage: python benchmarks/retract_where.py [FACTS]
+
+"""
+import sys
+import time
+
+from psyche import Environment
+
+
+RULES = """
+from psyche import Fact
+
+class Sample(Fact):
+    id: int
+    group: str
+"""
+
+
+def populate(facts: int) -> (Environment, type):
+    environment = Environment()
+    module = environment.loads(RULES, module_name='retract_where_benchmark')
+
+    for index in range(facts):
+        environment.insert_fact(module.Sample(id=index, group='benchmark'))
+
+    return environment, module.Sample
+
+
+def retract_each(environment: Environment, cls: type):
+    for fact in [f for f in environment.facts
+                 if isinstance(f, cls) and f.group == 'benchmark']:
+        fact.retract()
+
+
+def retract_where_slots(environment: Environment, cls: type):
+    environment.retract_where(cls, {'group': 'benchmark'})
+
+
+def retract_where_predicate(environment: Environment, cls: type):
+    environment.retract_where(cls, lambda f: f.group == 'benchmark')
+
+
+def main():
+    facts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    for benchmark in (retract_each, retract_where_slots, retract_where_predicate):
+        environment, cls = populate(facts)
+
+        start = time.perf_counter()
+        benchmark(environment, cls)
+        elapsed = time.perf_counter() - start
+
+        assert not environment.facts
+        print(f'{benchmark.__name__}: {facts} facts retracted in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
-__all__ = ['Environment', 'Fact', 'insert_fact']
+__all__ = ['CrossProductWarning', 'EngineService', 'Environment', 'Event', 'Fact',
+           'insert_fact']
 
 
-from psyche.facts import Fact
+from psyche.facts import Event, Fact
 from psyche.environment import Environment, insert_fact
+from psyche.service import EngineService
+from psyche.compiler import CrossProductWarning
@@ -3,6 +3,7 @@ import sys
 import random
 import string
 import textwrap
+import warnings
 import importlib
 import itertools
 
@@ -32,8 +33,9 @@ def import_source_code(source: str, module_name: str) -> ModuleType:
 def compile_rule(environment: 'Environment',
                  module_name: str,
                  name, lhs: lark.Tree,
-                 rhs: lark.Tree) -> str:
-    lhs_compiler = LHSCompiler(module_name, name, lhs)
+                 rhs: lark.Tree,
+                 reorder: bool = True) -> str:
+    lhs_compiler = LHSCompiler(module_name, name, lhs, reorder=reorder)
     lhs_string, variables = lhs_compiler.compile()
     rhs_compiler = RHSCompiler(environment, module_name, name, rhs, variables)
     rhs_string = rhs_compiler.compile()
@@ -42,13 +44,17 @@ def compile_rule(environment: 'Environment',
 
 
 class LHSCompiler(visitors.Transformer):
-    def __init__(self, module_name: str, name: str, tree: lark.Tree):
+    def __init__(self, module_name: str, name: str, tree: lark.Tree,
+                 reorder: bool = True):
         super().__init__()
 
         self._module_name = module_name
         self._name = name
         self._tree = tree
+        self._reorder = reorder
         self._variables = []
+        self._defined = 0
+        self._referenced = set()
 
     def __default__(self, *args):
         raise SyntaxError(f"Rule: {self._name} - Invalid Syntax: {args}")
@@ -59,13 +65,34 @@ class LHSCompiler(visitors.Transformer):
         return lhs, self._variables
 
     def lhs_stmt(self, node):
+        if self._reorder:
+            node = join_order(node)
+
+        self._check_cross_products(node)
+
         return os.linesep.join(node)
 
     def condition(self, node):
-        return '  ' + ' '.join(node)
+        defined = self._variables[self._defined:]
+        self._defined = len(self._variables)
+
+        code = '  ' + ' '.join(node)
+        used = self._referenced - set(defined)
+        self._referenced = set()
+        pattern = getattr(node[0], 'pattern', node[0])
+
+        if isinstance(pattern, Fact):
+            return Condition(code, defined, used, pattern,
+                             self._cardinality(pattern.template))
+
+        return Condition(code, defined, used)
 
     def fact_match(self, node):
-        return Fact(f'({node[0]} ' + ' '.join(node[1:]) + ')')
+        constraints = sum(getattr(c, 'count', 1) for c in node[1:])
+
+        return Fact(f'({node[0]} ' + ' '.join(node[1:]) + ')',
+                    template=str(node[0]),
+                    constraints=constraints)
 
     def bind(self, node):
         var, operator, value = node
@@ -77,7 +104,7 @@ class LHSCompiler(visitors.Transformer):
         variable = Variable(f'?{var}')
 
         if isinstance(value, Fact):
-            return Bind(f'{variable} {operator} {value}')
+            return Bind(f'{variable} {operator} {value}', pattern=value)
         if isinstance(value, Variable):
             return Bind(f'({value} {variable})')
 
@@ -90,7 +117,8 @@ class LHSCompiler(visitors.Transformer):
         return Constraints(' '.join([n.clips_string()
                                      if isinstance(n, Function)
                                      else n
-                                     for n in node]))
+                                     for n in node]),
+                           count=len(node))
 
     def python__funccall(self, node):
         if len(node) > 1:
@@ -163,7 +191,13 @@ class LHSCompiler(visitors.Transformer):
         return Comparator(COMPARATOR_MAP[str(node[0])])
 
     def python__var(self, node):
-        return Variable(str(node[0]))
+        variable = Variable(str(node[0]))
+
+        # Variables bound by the preceding conditions
+        if variable in self._variables:
+            self._referenced.add(variable)
+
+        return variable
 
     def python__string(self, node):
         code = str(node[0]).strip('"').strip("'")
@@ -179,6 +213,32 @@ class LHSCompiler(visitors.Transformer):
     def python__const_false(self, _):
         return Boolean('FALSE')
 
+    def _cardinality(self, template: str) -> int:
+        """Return the cardinality hint declared on the Fact class if any."""
+        fact = sys.modules[self._module_name].__dict__.get(template)
+
+        return getattr(fact, '__cardinality__', None)
+
+    def _check_cross_products(self, conditions: list):
+        bound = set()
+        patterns = False
+
+        for condition in conditions:
+            if condition.pattern is not None:
+                if patterns and not condition.variables & bound:
+                    # Point the warning at the rule rather than the compiler
+                    warnings.warn_explicit(
+                        f"Rule: {self._name} - Pattern {condition.pattern.template} "
+                        "shares no variables with the preceding conditions "
+                        "resulting in a cartesian product",
+                        CrossProductWarning,
+                        self._module_name,
+                        getattr(self._name, 'line', None) or 0)
+
+                patterns = True
+
+            bound |= condition.variables
+
 
 class RHSCompiler(visitors.Transformer):
     def __init__(self,
@@ -196,7 +256,7 @@ class RHSCompiler(visitors.Transformer):
         self._variables = set(variables)
 
     def compile(self):
-        rhs = self.transform(self._tree)
+        rhs = self.transform(self._compile_yields(self._tree))
         variables = ' '.join(f'?{v}' for v in self._variables)
         code = textwrap.dedent(reconstructor.reconstruct_code(rhs))
         compiled = compile(code, self._name, 'exec')
@@ -208,10 +268,40 @@ class RHSCompiler(visitors.Transformer):
     def rhs_stmt(self, node):
         return node[0]
 
+    def _compile_yields(self, tree: lark.Tree) -> lark.Tree:
+        """Compile the `yield` statements of the action, not of nested scopes."""
+        if not isinstance(tree, lark.Tree) or tree.data in NESTED_SCOPES:
+            return tree
+        if tree.data == 'python__yield_stmt':
+            return self._yield_stmt(tree.children)
+
+        return lark.Tree(tree.data, [self._compile_yields(c) for c in tree.children])
+
+    def _yield_stmt(self, node):
+        """Compile `yield value` into `__psyche_emit__(value)`."""
+        expression = node[0]
+        function = EMIT_FUNCTIONS[expression.data]
+        arguments = expression.children
+
+        if not arguments:
+            raise SyntaxError(f"Rule: {self._name} - Invalid Syntax: yield requires a value")
+        if getattr(arguments[0], 'data', None) == 'python__testlist_tuple':
+            arguments = arguments[0].children
+
+        return lark.Tree('python__expr_stmt', [
+            lark.Tree('python__funccall', [
+                lark.Tree('python__var', [lark.Token('NAME', function)]),
+                lark.Tree('python__arguments', arguments)])])
+
 
 class Bind(str):
-    def __new__(cls, value):
-        return super().__new__(cls, value)
+    pattern: 'Fact' = None
+
+    def __new__(cls, value, pattern: 'Fact' = None):
+        obj = super().__new__(cls, value)
+        obj.pattern = pattern
+
+        return obj
 
 
 class Binder(str):
@@ -278,13 +368,51 @@ class Operation(Function):
 
 
 class Constraints(str):
-    def __new__(cls, value):
-        return super().__new__(cls, value)
+    count: int = 0
+
+    def __new__(cls, value, count: int = 0):
+        obj = super().__new__(cls, value)
+        obj.count = count
+
+        return obj
 
 
 class Fact(str):
-    def __new__(cls, value):
-        return super().__new__(cls, value)
+    template: str = None
+    constraints: int = 0
+
+    def __new__(cls, value, template: str = None, constraints: int = 0):
+        obj = super().__new__(cls, value)
+        obj.template = template
+        obj.constraints = constraints
+
+        return obj
+
+
+class Condition(str):
+    """Compiled condition alongside the variables it defines and uses."""
+    defined: set = None
+    used: set = None
+    pattern: Fact = None
+    cardinality: int = None
+
+    def __new__(cls: type,
+                code: str,
+                defined: list,
+                used: set,
+                pattern: Fact = None,
+                cardinality: int = None):
+        obj = super().__new__(cls, code)
+        obj.defined = set(defined)
+        obj.used = used
+        obj.pattern = pattern
+        obj.cardinality = cardinality
+
+        return obj
+
+    @property
+    def variables(self) -> set:
+        return self.defined | self.used
 
 
 class String(str):
@@ -307,6 +435,10 @@ class Variable(str):
         return super().__new__(cls, value)
 
 
+class CrossProductWarning(UserWarning):
+    """A rule pattern is not joined with the preceding ones."""
+
+
 class Action(NamedTuple):
     env: 'Environment'
     code: 'code'
@@ -329,6 +461,42 @@ def is_clips_constraint(left: str, right: str) -> bool:
     return any(isinstance(c, CLIPS_TYPE) for c in (left, right))
 
 
+def join_order(conditions: list) -> list:
+    """Reorder the conditions so that the most selective ones come first.
+
+    Conditions are picked greedily among the ones whose variables
+    are already bound: tests first, then patterns joined with
+    the previous conditions, lower cardinality hints and more constraints.
+    Ties preserve the original order.
+
+    """
+    ordered = []
+    bound = set()
+    patterns = False
+    pending = list(conditions)
+
+    def cost(condition: Condition) -> tuple:
+        if condition.pattern is None:
+            return (0, )
+
+        cardinality = condition.cardinality
+        return (1,
+                patterns and not condition.variables & bound,
+                cardinality is None,
+                cardinality or 0,
+                -condition.pattern.constraints)
+
+    while pending:
+        condition = min((c for c in pending if c.used <= bound), key=cost)
+
+        pending.remove(condition)
+        ordered.append(condition)
+        bound |= condition.variables
+        patterns = patterns or condition.pattern is not None
+
+    return ordered
+
+
 def find_slot(function: str, arguments: list, data: RuleData) -> list:
     if is_slot_method(function, data):
         return qualname_root(function), f'?{random_name(6)}'
@@ -382,6 +550,13 @@ def flatten(list_of_strings: iter) -> iter:
 
 
 ACTION_MAP = {}
+EMIT_FUNCTIONS = {'python__yield_expr': '__psyche_emit__',
+                  'python__yield_from': '__psyche_emit_from__'}
+NESTED_SCOPES = {'python__funcdef',
+                 'python__async_funcdef',
+                 'python__lambdef',
+                 'python__lambdef_nocond',
+                 'python__classdef'}
 CLIPS_TYPE = String, Number, Boolean
 COMPARATOR_MAP = {'<': '<',
                   '<=': '<=',
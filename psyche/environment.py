@@ -1,7 +1,12 @@
 import sys
+import math
+import time
+import operator
 import builtins
 
 from pathlib import Path
+from typing import Callable, NamedTuple, Union
+from collections import Counter, deque
 from tempfile import NamedTemporaryFile
 
 import clips
@@ -12,8 +17,13 @@ from psyche import compiler
 
 
 class Environment:
-    def __init__(self):
+    def __init__(self, clock: callable = time.time, reorder_conditions: bool = True):
         self._facts = {}
+        self._events = {}
+        self._templates = Counter()
+        self._emitted = None
+        self._clock = clock
+        self._reorder_conditions = reorder_conditions
         self._env = clips.Environment()
         self._env.define_function(python_action, name='py-action')
         self._env.define_function(python_method, name='py-method')
@@ -42,7 +52,8 @@ class Environment:
 
         for rule in rules:
             clips_rule = compiler.compile_rule(
-                self, module_name, rule.name, rule.lhs, rule.rhs)
+                self, module_name, rule.name, rule.lhs, rule.rhs,
+                reorder=self._reorder_conditions)
             # print(clips_rule)
             self._env.build(clips_rule)
 
@@ -51,21 +62,276 @@ class Environment:
     def insert_fact(self, fact):
         cls = fact.__class__
         template = self._env.find_template(cls.__name__)
+
+        if isinstance(fact, facts.Event):
+            timestamp = fact.__dict__[cls.__timestamp__]
+            if timestamp is None:
+                timestamp = self._clock()
+
+            fact.__dict__[cls.__timestamp__] = float(timestamp)
+
         slots = {n: getattr(fact, n) for n in cls.__annotations__}
 
         fact_ptr = template.assert_fact(**slots)
+
+        # CLIPS returns the existing fact when asserting a duplicate
+        if fact_ptr in self._facts:
+            return self._facts[fact_ptr]
+
         fact._env = self
         fact._fact = fact_ptr
         self._facts[fact_ptr] = fact
+        self._templates[cls.__name__] += 1
+
+        if isinstance(fact, facts.Event):
+            self._event_queue(cls).push(slots[cls.__timestamp__], fact)
 
         return fact
 
-    def run(self):
-        self._env.run()
+    def modify_fact(self, fact, **slots):
+        cls = fact.__class__
+
+        if isinstance(fact, facts.Event) and cls.__timestamp__ in slots:
+            slots[cls.__timestamp__] = float(slots[cls.__timestamp__])
+
+        fact._fact.modify_slots(**slots)
+
+        self._update_fact(fact, slots)
+
+    def retract_fact(self, fact):
+        fact._fact.retract()
+
+        self._unregister_fact(fact)
+
+    def retract_where(self, cls: type, where: Union[Callable, dict]) -> int:
+        """Retract the facts of the given class matching `where`.
+
+        `where` is either a predicate called with each fact
+        or a dictionary of slot values the facts must be equal to.
+
+        Returns the number of retracted facts.
+
+        """
+        # Selecting within CLIPS is slower as each fact must be wrapped again
+        selected = self._select_facts(cls, where)
+
+        for fact in selected:
+            fact._fact.retract()
+
+        self._unregister_facts(cls, selected)
+
+        return len(selected)
+
+    def modify_where(self, cls: type, where: Union[Callable, dict], **slots) -> int:
+        """Modify the slots of the facts of the given class matching `where`.
+
+        `where` follows the same rules as in `retract_where`.
+        If both the filters and the slot values match the slot types,
+        the facts are modified within CLIPS.
+
+        Returns the number of modified facts.
+
+        """
+        selected = self._select_facts(cls, where)
+        query = fact_query(cls, where)
+        values = clips_values(cls, slots)
+
+        if query is not None and values is not None:
+            modifications = ' '.join(f'({n} {v})' for n, v in values.items())
+            self._env.eval(f'(do-for-all-facts {query} (modify ?f {modifications}))')
+
+            for fact in selected:
+                self._update_fact(fact, slots)
+        else:
+            for fact in selected:
+                self.modify_fact(fact, **slots)
+
+        return len(selected)
+
+    def expire_events(self):
+        """Retract the Events outside their retention window or limit."""
+        now = self._clock()
+
+        for queue in self._events.values():
+            for event in queue.expired(now):
+                self.retract_fact(event)
+
+    def memory_stats(self,
+                     partial_matches_threshold: int = None,
+                     callback: callable = None) -> 'MemoryStats':
+        """Report working memory and Rete memory usage.
+
+        If `partial_matches_threshold` is given, `callback` is called
+        with the name and the RuleStats of each Rule exceeding it.
+
+        """
+        if partial_matches_threshold is not None and callback is None:
+            raise ValueError("A callback is required with partial_matches_threshold")
+
+        rules = {}
+
+        for rule in self._env.rules():
+            stats = rules[rule.name] = RuleStats(*rule.matches())
+
+            if (partial_matches_threshold is not None and
+                    stats.partial_matches > partial_matches_threshold):
+                callback(rule.name, stats)
+
+        return MemoryStats(dict(+self._templates),
+                           rules,
+                           self._env.eval('(mem-used)'),
+                           len(self._facts))
+
+    def run(self, limit: int = None) -> int:
+        self.expire_events()
+
+        return self._env.run(limit=limit)
+
+    def run_iter(self, limit: int = None) -> iter:
+        """Run the Environment yielding the records emitted by the Rules.
+
+        Rules are fired one at a time and their records yielded as soon
+        as they are emitted. Closing the generator stops the run.
+
+        """
+        self.expire_events()
+        self._emitted = deque()
+
+        try:
+            fired = 0
+
+            while limit is None or fired < limit:
+                if not self._env.run(limit=1):
+                    break
+
+                fired += 1
+
+                while self._emitted:
+                    yield self._emitted.popleft()
+        finally:
+            self._emitted = None
 
     def reset(self):
         self._env.reset()
         self._facts = {}
+        self._events = {}
+        self._templates = Counter()
+
+    def _select_facts(self, cls: type, where: Union[Callable, dict]) -> list:
+        if not callable(where):
+            check_slots(cls, where)
+            getter = operator.attrgetter(*where) if where else lambda _: ()
+            values = tuple(where.values()) if len(where) != 1 else next(iter(where.values()))
+            where = lambda f: getter(f) == values
+
+        return [f for f in self._facts.values() if f.__class__ is cls and where(f)]
+
+    def _update_fact(self, fact, slots: dict):
+        """Reflect the slots modified within CLIPS on the given fact."""
+        cls = fact.__class__
+
+        fact.__dict__.update(slots)
+
+        # Modified facts duplicating existing ones are discarded by CLIPS
+        if not fact._fact.exists:
+            self._unregister_fact(fact)
+        elif isinstance(fact, facts.Event) and cls.__timestamp__ in slots:
+            queue = self._event_queue(cls)
+            queue.discard(fact)
+            queue.push(slots[cls.__timestamp__], fact)
+
+    def _unregister_fact(self, fact):
+        self._unregister_facts(fact.__class__, (fact, ))
+
+    def _unregister_facts(self, cls: type, selected: list):
+        """Remove the given facts of the same class from the registry."""
+        for fact in selected:
+            del self._facts[fact._fact]
+
+        if issubclass(cls, facts.Event):
+            queue = self._event_queue(cls)
+            for fact in selected:
+                queue.discard(fact)
+
+        self._templates[cls.__name__] -= len(selected)
+
+    def _event_queue(self, cls: type) -> 'EventQueue':
+        queue = self._events.get(cls)
+        if queue is None:
+            queue = self._events[cls] = facts.EventQueue(
+                window=cls.__window__, limit=cls.__limit__)
+
+        return queue
+
+
+class RuleStats(NamedTuple):
+    matches: int
+    partial_matches: int
+    activations: int
+
+
+class MemoryStats(NamedTuple):
+    facts: dict
+    rules: dict
+    clips_memory: int
+    registry_size: int
+
+
+def fact_query(cls: type, where: Union[Callable, dict]) -> str:
+    """Build the CLIPS fact-set query selecting the facts matching `where`.
+
+    Returns None if `where` cannot be expressed in CLIPS.
+
+    """
+    if callable(where):
+        return None
+
+    values = clips_values(cls, where)
+    if values is None:
+        return None
+
+    tests = [f'(eq ?f:{n} {v})' for n, v in values.items()]
+    if not tests:
+        query = 'TRUE'
+    elif len(tests) == 1:
+        query = tests[0]
+    else:
+        query = f"(and {' '.join(tests)})"
+
+    return f'((?f {cls.__name__})) {query}'
+
+
+def clips_values(cls: type, slots: dict) -> dict:
+    """Convert the slot values into CLIPS literals.
+
+    Returns None if any value does not match its slot type.
+
+    """
+    check_slots(cls, slots)
+
+    values = {}
+
+    for name, value in slots.items():
+        slot_type = cls.__annotations__[name]
+        if type(value) is not slot_type or slot_type not in facts.TYPE_MAP:
+            return None
+
+        if slot_type is bool:
+            values[name] = 'TRUE' if value else 'FALSE'
+        elif slot_type is str:
+            values[name] = '"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+        elif slot_type is float and not math.isfinite(value):
+            return None
+        else:
+            values[name] = repr(value)
+
+    return values
+
+
+def check_slots(cls: type, slots: dict):
+    unknown = set(slots) - set(cls.__annotations__)
+    if unknown:
+        raise TypeError(f"{cls.__name__} has no slots {', '.join(sorted(unknown))}")
 
 
 def insert_fact(fact):
@@ -78,7 +344,10 @@ def python_action(name, *args):
             if isinstance(a, clips.TemplateFact)
             else a
             for a in args]
-    glbls = action.module.__dict__ | dict(zip(action.varnames, args))
+    glbls = (EMIT_GLOBALS |
+             action.module.__dict__ |
+             YIELD_GLOBALS |
+             dict(zip(action.varnames, args)))
 
     # Globals are set when the function is defined, not when it's called
     global PSYCHE
@@ -87,6 +356,21 @@ def python_action(name, *args):
     exec(action.code, glbls)
 
 
+def emit(*values):
+    """Emit a record from a Rule action.
+
+    Records are yielded by `Environment.run_iter` and ignored otherwise.
+
+    """
+    if PSYCHE._emitted is not None:
+        PSYCHE._emitted.append(values[0] if len(values) == 1 else values)
+
+
+def emit_from(iterable: iter):
+    for value in iterable:
+        emit(value)
+
+
 def python_eval(modname: str, code: str, *varmap: list) -> type:
     glbls = sys.modules[modname].__dict__
 
@@ -130,3 +414,5 @@ def grouper(iterable, size):
 
 
 PSYCHE = None
+EMIT_GLOBALS = {'emit': emit, 'emit_from': emit_from}
+YIELD_GLOBALS = {'__psyche_emit__': emit, '__psyche_emit_from__': emit_from}
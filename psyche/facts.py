@@ -1,4 +1,6 @@
 import os
+import heapq
+import itertools
 
 from typing import List
 from types import ModuleType
@@ -65,15 +67,92 @@ class Fact(metaclass=MetaFact):
         if self._fact is None:
             raise RuntimeError("Cannot modify a fact which is not inserted")
 
-        self._fact.modify_slots(**kwargs)
+        self._env.modify_fact(self, **kwargs)
 
     def retract(self):
         if self._fact is None:
             raise RuntimeError("Cannot retract a fact which is not inserted")
 
-        self._fact.retract()
+        self._env.retract_fact(self)
+
+
+class Event(Fact):
+    """Fact with a limited lifetime within the Environment.
+
+    Events carry a float timestamp slot named after `__timestamp__`.
+    If not given, the timestamp is set by the Environment upon insertion.
+
+    Events older than `__window__` seconds or exceeding the most recent
+    `__limit__` ones are automatically retracted before each run.
+
+    """
+    __timestamp__ = 'timestamp'
+    __window__ = None
+    __limit__ = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        timestamp = cls.__annotations__.setdefault(cls.__timestamp__, float)
+        if timestamp is not float:
+            raise TypeError(f"Event {cls.__name__} slot {cls.__timestamp__} must be float")
+
+
+class EventQueue:
+    """Time ordered index of the Events of a given class.
+
+    Events removed from the index are marked rather than deleted
+    and get discarded once they reach the head of the heap
+    or when they outnumber the indexed Events.
+
+    """
+    def __init__(self, window: float = None, limit: int = None):
+        self.window = window
+        self.limit = limit
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def push(self, timestamp: float, event: Event):
+        entry = [timestamp, next(self._counter), event]
+        self._entries[event._fact] = entry
+
+        heapq.heappush(self._heap, entry)
+
+    def discard(self, event: Event):
+        entry = self._entries.pop(event._fact, None)
+        if entry is not None:
+            entry[-1] = None
+
+        if len(self._heap) > 2 * len(self._entries):
+            self._heap = [e for e in self._heap if e[-1] is not None]
+            heapq.heapify(self._heap)
+
+    def expired(self, now: float) -> List[Event]:
+        """Remove and return the Events outside the window or limit."""
+        events = []
+        deadline = now - self.window if self.window is not None else None
+
+        while self._heap:
+            timestamp, _, event = self._heap[0]
+
+            if event is not None and not self._expired(timestamp, deadline):
+                break
+
+            heapq.heappop(self._heap)
+
+            if event is not None:
+                del self._entries[event._fact]
+                events.append(event)
+
+        return events
 
-        del self._env._facts[self._fact]
+    def _expired(self, timestamp: float, deadline: float) -> bool:
+        return ((deadline is not None and timestamp < deadline) or
+                (self.limit is not None and len(self._entries) > self.limit))
 
 
 class ClipsFact:
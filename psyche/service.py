@@ -0,0 +1,218 @@
+import time
+import queue
+import logging
+import threading
+
+from typing import NamedTuple
+
+from psyche.environment import Environment
+
+
+class EngineService:
+    """Run an Environment on a dedicated thread.
+
+    Facts can be inserted, modified and retracted from any thread.
+    Operations are queued and applied in micro-batches of at most
+    `batch_size` operations or `batch_latency` seconds.
+    The Environment is run once per batch.
+
+    Once `queue_size` operations are pending, submitting blocks
+    until room is available or `timeout` expires raising `queue.Full`.
+
+    Once the service is stopping, submitting raises `RuntimeError`.
+
+    """
+    def __init__(self,
+                 environment: Environment = None,
+                 batch_size: int = 1000,
+                 batch_latency: float = 0.01,
+                 queue_size: int = 10000,
+                 on_error: callable = None):
+        self.environment = environment if environment is not None else Environment()
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.on_error = on_error if on_error is not None else log_error
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._submitted = threading.Condition(self._lock)
+        self._submitting = 0
+        self._stopping = False
+        self._operations = 0
+        self._batches = 0
+        self._errors = 0
+        self._last_batch_size = 0
+        self._last_batch_latency = 0.0
+        self._max_batch_latency = 0.0
+
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def metrics(self) -> 'ServiceMetrics':
+        with self._lock:
+            return ServiceMetrics(self._queue.qsize(),
+                                  self._operations,
+                                  self._batches,
+                                  self._errors,
+                                  self._last_batch_size,
+                                  self._last_batch_latency,
+                                  self._max_batch_latency)
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("Service already running")
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._serve,
+                                        name='psyche-engine',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Apply the pending operations and stop the service.
+
+        Raises `queue.Full` if the pending operations cannot be
+        queued within `timeout`, leaving the service running.
+        Raises `TimeoutError` if they are not applied within `timeout`,
+        the service stops once done.
+
+        """
+        if not self.running:
+            return
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        def remaining() -> float:
+            return max(deadline - time.monotonic(), 0) if deadline is not None else None
+
+        # Operations being submitted must be queued before STOP
+        with self._lock:
+            self._stopping = True
+
+            if not self._submitted.wait_for(lambda: not self._submitting, remaining()):
+                self._stopping = False
+                raise queue.Full("Timeout waiting for submitted operations")
+
+        try:
+            self._queue.put(STOP, timeout=remaining())
+        except queue.Full:
+            with self._lock:
+                self._stopping = False
+            raise
+
+        self._thread.join(remaining())
+        if self._thread.is_alive():
+            raise TimeoutError("Timeout waiting for pending operations")
+
+    def insert_fact(self, fact, timeout: float = None):
+        self._submit(self.environment.insert_fact, (fact, ), {}, timeout)
+
+    def modify_fact(self, fact, timeout: float = None, **slots):
+        self._submit(fact.modify, (), slots, timeout)
+
+    def retract_fact(self, fact, timeout: float = None):
+        self._submit(self.environment.retract_fact, (fact, ), {}, timeout)
+
+    def _submit(self, function: callable, args: tuple, kwargs: dict, timeout: float):
+        with self._lock:
+            if self._stopping or not self.running:
+                raise RuntimeError("Service is not running")
+
+            self._submitting += 1
+
+        try:
+            self._queue.put(Operation(function, args, kwargs), timeout=timeout)
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                self._submitted.notify_all()
+
+    def _serve(self):
+        stopping = False
+
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if not batch:
+                continue
+
+            start = time.monotonic()
+            errors = 0
+
+            for operation in batch:
+                try:
+                    operation.function(*operation.args, **operation.kwargs)
+                except Exception as error:
+                    errors += 1
+                    self.on_error(error)
+
+            try:
+                self.environment.run()
+            except Exception as error:
+                errors += 1
+                self.on_error(error)
+
+            self._update_metrics(len(batch), errors, time.monotonic() - start)
+
+    def _next_batch(self) -> (list, bool):
+        """Block until an operation is available, then collect the batch."""
+        batch = []
+        operation = self._queue.get()
+        deadline = time.monotonic() + self.batch_latency
+
+        while operation is not STOP:
+            batch.append(operation)
+
+            remaining = deadline - time.monotonic()
+            if len(batch) >= self.batch_size or remaining <= 0:
+                return batch, False
+
+            try:
+                operation = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+
+        return batch, True
+
+    def _update_metrics(self, size: int, errors: int, latency: float):
+        with self._lock:
+            self._operations += size
+            self._batches += 1
+            self._errors += errors
+            self._last_batch_size = size
+            self._last_batch_latency = latency
+            self._max_batch_latency = max(self._max_batch_latency, latency)
+
+
+class Operation(NamedTuple):
+    function: callable
+    args: tuple
+    kwargs: dict
+
+
+class ServiceMetrics(NamedTuple):
+    queue_depth: int
+    operations: int
+    batches: int
+    errors: int
+    last_batch_size: int
+    last_batch_latency: float
+    max_batch_latency: float
+
+
+def log_error(error: Exception):
+    logging.getLogger(__name__).error(
+        "Error processing operation", exc_info=error)
+
+
+STOP = object()